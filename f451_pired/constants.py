@@ -39,7 +39,7 @@ KWD_DATA_HUMID = 'humidity'
 # =========================================================
 #   C O N S T A N T S   F O R   D I S P L A Y   M O D E S
 # =========================================================
-DISPL_TEMPS = KWD_DATA_TEMPS    # Display download speed
-DISPL_PRESS = KWD_DATA_PRESS    # Display upload speed
-DISPL_HUMID = KWD_DATA_HUMID    # Display ping response time
+DISPL_TEMPS = KWD_DATA_TEMPS    # Display temperature
+DISPL_PRESS = KWD_DATA_PRESS    # Display barometric pressure
+DISPL_HUMID = KWD_DATA_HUMID    # Display humidity
 # fmt: on
@@ -45,33 +45,35 @@ import time
 import sys
 import asyncio
 import contextlib
+import functools
 import platform
+import threading
 
-from collections import deque
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 
 from . import constants as const
 
 import f451_common.cli_ui as f451CLIUI
 import f451_common.common as f451Common
 import f451_common.logger as f451Logger
-import f451_common.cloud as f451Cloud
 
 import f451_sensehat.sensehat as f451SenseHat
 import f451_sensehat.sensehat_data as f451SenseData
 
 from rich.console import Console
-from rich.live import Live
 
-from Adafruit_IO import RequestError, ThrottlingError
-
-# Install Rich 'traceback' and 'pprint' to
+# Use Rich 'pprint' (and 'traceback' in debug mode) to
 # make (debug) life is easier. Trust me!
 from rich.pretty import pprint
-from rich.traceback import install as install_rich_traceback
 
-install_rich_traceback(show_locals=True)
+# Cloud support (i.e. Adafruit IO client, 'requests', etc.) is expensive
+# to import. So 'main()' imports it once we know that we'll actually 
+# upload data, and these module-level names are set at that point.
+f451Cloud = None
+RequestError = None
+ThrottlingError = None
 
 
 # fmt: off
@@ -83,18 +85,22 @@ APP_NAME = 'f451 Labs - SenseMon'
 APP_NAME_SHORT = 'SenseMon'
 APP_LOG = 'f451-sensemon.log'       # Individual logs for devices with multiple apps
 APP_SETTINGS = 'settings.toml'      # Standard for all f451 Labs projects
+APP_HOSTNAME = platform.node()      # Device 'hostname' does not change while app runs
+APP_DIR = Path(__file__).parent     # Dir for this app
 
 APP_MIN_SENSOR_READ_WAIT = 1        # Min wait in sec between sensor reads
 APP_MIN_PROG_WAIT = 1               # Remaining min (loop) wait time to display prog bar
+APP_MAX_UPLOAD_WAIT = 10            # Max wait in sec for upload in progress when we exit
+APP_PROG_PIXELS = 8                 # Num pixels in Sense HAT LED progress bar
 APP_WAIT_1SEC = 1
 APP_MAX_DATA = 120                  # Max number of data points in the queue
 APP_DELTA_FACTOR = 0.02             # Any change within X% is considered negligable
 
-APP_DATA_TYPES = [
+APP_DATA_TYPES = (
     const.KWD_DATA_TEMPS,           # 'temperature' in C
     const.KWD_DATA_PRESS,           # barometric 'pressure'
-    const.KWD_DATA_HUMID            # 'humidity'
-]
+    const.KWD_DATA_HUMID,           # 'humidity'
+)
 
 APP_DISPL_MODES = [
     const.DISPL_TEMPS,              # Display 'temperature' in C
@@ -102,9 +108,61 @@ APP_DISPL_MODES = [
     const.DISPL_HUMID,              # Display 'humidity'
 ]
 
+APP_CONFIG_DEFAULTS = {
+    const.KWD_FREQ: const.DEF_FREQ,
+    const.KWD_DELAY: const.DEF_DELAY,
+    const.KWD_WAIT: const.DEF_WAIT,
+    const.KWD_THROTTLE: const.DEF_THROTTLE,
+    const.KWD_ROUNDING: const.DEF_ROUNDING,
+    f451Common.KWD_TEMP_COMP: f451Common.DEF_TEMP_COMP_FACTOR,
+    f451Common.KWD_MAX_LEN_CPU_TEMPS: f451Common.MAX_LEN_CPU_TEMPS,
+}
+
 COLOR_LOGO_FG = (255, 0, 0)
 COLOR_LOGO_BG = (67, 70, 75)
 
+class RingBuf:
+    """Fixed-size ring buffer with running sum.
+    
+    We use this to hold recent CPU temperatures. The running sum is updated 
+    each time a value is added, so the average is available without having
+    to add up all values in the buffer on every sensor read.
+    """
+    __slots__ = ('buf', 'idx', 'sum', 'size')
+
+    def __init__(self, size, initial=0.0):
+        self.buf = [initial] * size
+        self.idx = 0
+        self.sum = initial * size
+        self.size = size
+
+    def push(self, val):
+        """Replace oldest value in buffer with new value"""
+        self.sum += val - self.buf[self.idx]
+        self.buf[self.idx] = val
+        self.idx = (self.idx + 1) % self.size
+
+        # Re-sync running sum once per lap to avoid float drift
+        if self.idx == 0:
+            self.sum = sum(self.buf)
+
+    @property
+    def mean(self):
+        return self.sum / self.size
+
+def wall_time(monoTime):
+    """Convert 'time.monotonic()' value to wall clock time
+
+    We use monotonic time for all internal timers as it's not affected 
+    by system clock changes (e.g. NTP sync after boot). But the terminal
+    UI needs wall clock time when displaying upload times.
+    """
+    return time.time() - (time.monotonic() - monoTime)
+
+def _no_temp_comp(tempRaw, cpuTempsQ):
+    """Stand-in for 'AppRT.compensate_temp()' when CPU temp compensation is off"""
+    return tempRaw
+
 class AppRT(f451Common.Runtime):
     """Application runtime object.
     
@@ -119,8 +177,8 @@ class AppRT(f451Common.Runtime):
             appNameShort, 
             appLog, 
             appSettings,
-            platform.node(),        # Get device 'hostname'
-            Path(__file__).parent   # Find dir for this app
+            APP_HOSTNAME,
+            APP_DIR
         )
         
     def _init_log_settings(self, cliArgs):
@@ -153,31 +211,51 @@ class AppRT(f451Common.Runtime):
         self.config = f451Common.load_settings(self.appDir.joinpath(self.appSettings))
         self.logger = f451Logger.Logger(self.config, LOGFILE=self.appLog)
 
-        self.ioFreq = self.config.get(const.KWD_FREQ, const.DEF_FREQ)
-        self.ioDelay = self.config.get(const.KWD_DELAY, const.DEF_DELAY)
-        self.ioWait = max(self.config.get(const.KWD_WAIT, const.DEF_WAIT), APP_MIN_SENSOR_READ_WAIT)
-        self.ioThrottle = self.config.get(const.KWD_THROTTLE, const.DEF_THROTTLE)
-        self.ioRounding = self.config.get(const.KWD_ROUNDING, const.DEF_ROUNDING)
+        # Merge settings with defaults once, so that we don't 
+        # need a separate 'get()' w/ default for each setting
+        cfg = {**APP_CONFIG_DEFAULTS, **self.config}
+
+        self.ioFreq = cfg[const.KWD_FREQ]
+        self.ioDelay = cfg[const.KWD_DELAY]
+        self.ioWait = max(cfg[const.KWD_WAIT], APP_MIN_SENSOR_READ_WAIT)
+        self.ioThrottle = cfg[const.KWD_THROTTLE]
+        self.ioRounding = cfg[const.KWD_ROUNDING]
         self.ioUploadAndExit = False
 
+        # Device ID does not change while the app is running
+        self.deviceID = f451Common.get_RPI_ID(f451Common.DEF_ID_PREFIX)
+
         # Initialize log file/level
         self._init_log_settings(cliArgs)
 
         # Initialize various counters, etc.
         self.timeSinceUpdate = float(0)
-        self.timeUpdate = time.time()
+        self.timeUpdate = time.monotonic()
         self.displayUpdate = self.timeUpdate
         self.uploadDelay = self.ioDelay
         self.maxUploads = int(cliArgs.uploads)
         self.numUploads = 0
+        self.numReads = 0               # Num sensor reads (lets LED know when there's new data)
         self.loopWait = APP_WAIT_1SEC   # Wait time between main loop cycles
+        self.wakeEvent = threading.Event()  # Joystick events can wake up main loop
+
+        # We use one event loop for all uploads instead of having
+        # 'asyncio.run()' create (and tear down) a new one each time. The
+        # loop runs in a background thread so that uploads do not block
+        # sensor reads and LED updates.
+        self.eventLoop = asyncio.new_event_loop()
+        self.eventThread = threading.Thread(target=self.eventLoop.run_forever, daemon=True)
+        self.eventThread.start()
+        self.uploadJob = None       # (future, start time, payload) for upload in progress
 
         # Configure CPU temp comp factor
-        self.tempCompFactor = self.config.get(f451Common.KWD_TEMP_COMP, f451Common.DEF_TEMP_COMP_FACTOR)
-        self.cpuTempsQMaxLen = self.config.get(f451Common.KWD_MAX_LEN_CPU_TEMPS, f451Common.MAX_LEN_CPU_TEMPS)
+        self.tempCompFactor = cfg[f451Common.KWD_TEMP_COMP]
+        self.cpuTempsQMaxLen = cfg[f451Common.KWD_MAX_LEN_CPU_TEMPS]
 
-        # If comp factor is 0 (zero), then do NOT compensate for CPU temp
+        # If comp factor is 0 (zero), then do NOT compensate for CPU temp. We
+        # pick the method once here so that we don't need to check each time.
         self.tempCompYN = self.tempCompFactor > 0
+        self.compensate_temp = self._compensate_temp if self.tempCompYN else _no_temp_comp
 
         # Initialize UI for terminal
         if cliArgs.noCLI:
@@ -201,15 +279,55 @@ class AppRT(f451Common.Runtime):
         HAT temp sensors.
         """
         return (
-            deque(
-                [self.sensors['SenseHat'].get_CPU_temp(False)]
-                * self.cpuTempsQMaxLen,
-                maxlen=self.cpuTempsQMaxLen,
-            )
+            RingBuf(self.cpuTempsQMaxLen, self.sensors['SenseHat'].get_CPU_temp(False))
             if self.tempCompYN
             else []
         )
 
+    def close_event_loop(self):
+        """Stop background event loop and clean up
+
+        Any upload that is still in progress at this point is cancelled. But
+        if the upload is stuck in a blocking call, then we give up waiting
+        after a while and leave the (daemon) thread to die with the app.
+        """
+        if self.uploadJob is not None:
+            self.uploadJob[0].cancel()
+
+        self.eventLoop.call_soon_threadsafe(self.eventLoop.stop)
+        self.eventThread.join(APP_MAX_UPLOAD_WAIT)
+        if self.eventThread.is_alive():
+            return
+
+        # Let cancelled tasks (if any) wrap up before we close the loop
+        pending = asyncio.all_tasks(self.eventLoop)
+        if pending:
+            self.eventLoop.run_until_complete(asyncio.wait(pending))
+        self.eventLoop.run_until_complete(self.eventLoop.shutdown_asyncgens())
+        self.eventLoop.close()
+
+    def _compensate_temp(self, tempRaw, cpuTempsQ):
+        """Compensate raw temperature for CPU temperature
+        
+        Get current CPU temp, add to queue, and use new average to 
+        adjust the raw temperature read from the Sense HAT.
+
+        NOTE: This feature relies on the 'vcgencmd' which is found on
+              RPIs. If this is not run on a RPI (e.g. during testing),
+              then we need to neutralize the 'cpuTemp' compensation.
+
+        Args:
+            tempRaw: raw temperature from Sense HAT
+            cpuTempsQ: queue with recent CPU temps
+
+        Returns:
+            compensated temperature
+        """
+        cpuTempsQ.push(self.sensors['SenseHat'].get_CPU_temp(False))
+
+        # Smooth out with some averaging to decrease jitter
+        return tempRaw - ((cpuTempsQ.mean - tempRaw) / self.tempCompFactor)
+
     def debug(self, cli=None, data=None):
         """Print/log some basic debug info.
         
@@ -220,26 +338,33 @@ class AppRT(f451Common.Runtime):
 
         self.console.rule('Config Settings', style='grey', align='center')
 
-        self.logger.log_debug(f"DISPL ROT:   {self.sensors['SenseHat'].displRotation}")
-        self.logger.log_debug(f"DISPL MODE:  {self.sensors['SenseHat'].displMode}")
-        self.logger.log_debug(f"DISPL PROGR: {self.sensors['SenseHat'].displProgress}")
-        self.logger.log_debug(f"SLEEP TIME:  {self.sensors['SenseHat'].displSleepTime}")
-        self.logger.log_debug(f"SLEEP MODE:  {self.sensors['SenseHat'].displSleepMode}")
-
-        self.logger.log_debug(f'IO DEL:      {self.ioDelay}')
-        self.logger.log_debug(f'IO WAIT:     {self.ioWait}')
-        self.logger.log_debug(f'IO THROTTLE: {self.ioThrottle}')
+        # Look up SenseHat object only once
+        sense = self.sensors['SenseHat']
+
+        rows = (
+            ('DISPL ROT:', sense.displRotation),
+            ('DISPL MODE:', sense.displMode),
+            ('DISPL PROGR:', sense.displProgress),
+            ('SLEEP TIME:', sense.displSleepTime),
+            ('SLEEP MODE:', sense.displSleepMode),
+            ('IO DEL:', self.ioDelay),
+            ('IO WAIT:', self.ioWait),
+            ('IO THROTTLE:', self.ioThrottle),
+        )
+        lines = [f'{label:<12} {val}' for label, val in rows]
 
-        # Display Raspberry Pi serial and Wi-Fi status
-        self.logger.log_debug(f'Raspberry Pi serial: {f451Common.get_RPI_serial_num()}')
-        self.logger.log_debug(
+        # Add Raspberry Pi serial and Wi-Fi status
+        lines.append(f'Raspberry Pi serial: {f451Common.get_RPI_serial_num()}')
+        lines.append(
             f'Wi-Fi: {(f451Common.STATUS_YES if f451Common.check_wifi() else f451Common.STATUS_UNKNOWN)}'
         )
 
-        # List CLI args
+        # Add CLI args
         if cli:
-            for key, val in vars(cli).items():
-                self.logger.log_debug(f"CLI Arg '{key}': {val}")
+            lines.extend(f"CLI Arg '{key}': {val}" for key, val in vars(cli).items())
+
+        # Log everything as a single entry
+        self.logger.log_debug('\n'.join(lines))
 
         # List config settings
         self.console.rule('CONFIG', style='grey', align='center')  # type: ignore
@@ -297,6 +422,7 @@ class AppRT(f451Common.Runtime):
     def update_upload_status(self, cliUI, lastTime, lastStatus):
         """Wrapper to help streamline code"""
         if cliUI:
+            lastTime = wall_time(lastTime)
             self.console.update_upload_status(      # type: ignore
                 lastTime, 
                 lastStatus, 
@@ -318,7 +444,7 @@ appRT = AppRT(APP_NAME, APP_VERSION, APP_NAME_SHORT, APP_LOG, APP_SETTINGS)
 # =========================================================
 #              H E L P E R   F U N C T I O N S
 # =========================================================
-async def upload_sensor_data(app, *args, **kwargs):
+async def upload_sensor_data(app, payload, *, deviceID=None):
     """Send sensor data to cloud services.
 
     This helper function parses and sends enviro data to
@@ -332,105 +458,120 @@ async def upload_sensor_data(app, *args, **kwargs):
           'humidity'    - humidity
 
     Args:
-        app:    app: hook to app runtime object
-        args:   user can provide single 'dict' with data
-        kwargs: user can provide individual data points as key-value pairs
+        app:        hook to app runtime object
+        payload:    'dict' with data points keyed by data type
+        deviceID:   (optional) ID of device that collected the data
     """
-    # We combine 'args' and 'kwargs' to allow users to provide a 'dict' with
-    # all data points and/or individual data points (which could override
-    # values in the 'dict').
-    data = {**args[0], **kwargs} if args and isinstance(args[0], dict) else kwargs
-
+    # Feeds are keyed by data type (i.e. 'temperature', etc.) so we can
+    # walk them directly instead of looking up each feed by name.
     sendQ = []
+    for dataType, feed in app.feeds.items():
+        val = payload.get(dataType)
+        if val is not None:
+            sendQ.append(feed.send_data(val))
 
-    # Send temperature data?
-    if data.get(const.KWD_DATA_TEMPS) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_TEMPS].send_data(data.get(const.KWD_DATA_TEMPS)))  # type: ignore
-
-    # Send barometric pressure data?
-    if data.get(const.KWD_DATA_PRESS) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_PRESS].send_data(data.get(const.KWD_DATA_PRESS)))  # type: ignore
+    # deviceID = SENSE_HAT.get_ID(DEF_ID_PREFIX)
 
-    # Send humidity data?
-    if data.get(const.KWD_DATA_HUMID) is not None:
-        sendQ.append(app.feeds[const.KWD_DATA_HUMID].send_data(data.get(const.KWD_DATA_HUMID)))  # type: ignore
+    # No need for 'gather()' overhead unless we have several uploads
+    if len(sendQ) > 1:
+        await asyncio.gather(*sendQ)
+    elif sendQ:
+        await sendQ[0]
 
-    # deviceID = SENSE_HAT.get_ID(DEF_ID_PREFIX)
 
-    await asyncio.gather(*sendQ)
+def btn_handler(action):
+    """Create SenseHat Joystick event handler
 
+    All joystick directions share the same logic: ignore 'release' events,
+    perform the action, and reset screen blanking. We also wake up the main
+    loop so that the LED is updated right away.
 
-def btn_up(event):
-    """SenseHat Joystick UP event
+    Args:
+        action: function that takes SenseHat object and performs action
 
-    Rotate display by -90 degrees and reset screen blanking
+    Returns:
+        event handler function
     """
-    global appRT
+    def _handler(event):
+        if event.action != f451SenseHat.BTN_RELEASE:
+            action(appRT.sensors['SenseHat'])
+            appRT.displayUpdate = time.monotonic()
+            appRT.wakeEvent.set()
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].display_rotate(-1)
-        appRT.displayUpdate = time.time()
+    return _handler
 
 
-def btn_down(event):
-    """SenseHat Joystick DOWN event
+def btn_middle(event):
+    """SenseHat Joystick MIDDLE (down) event
 
-    Rotate display by +90 degrees and reset screen blanking
+    Turn display on/off
     """
     global appRT
 
     if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].display_rotate(1)
-        appRT.displayUpdate = time.time()
+        sense = appRT.sensors['SenseHat']
 
+        # Wake up?
+        if sense.displSleepMode:
+            sense.update_sleep_mode(False)
+            appRT.displayUpdate = time.monotonic()
+        else:
+            sense.update_sleep_mode(True)
 
-def btn_left(event):
-    """SenseHat Joystick LEFT event
+        appRT.wakeEvent.set()
 
-    Switch display mode by 1 mode and reset screen blanking
-    """
-    global appRT
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].set_display_mode(-1)
-        appRT.displayUpdate = time.time()
+APP_JOYSTICK_ACTIONS = MappingProxyType({
+    # UP/DOWN - rotate display by -/+ 90 degrees
+    f451SenseHat.KWD_BTN_UP: btn_handler(lambda sense: sense.display_rotate(-1)),
+    f451SenseHat.KWD_BTN_DWN: btn_handler(lambda sense: sense.display_rotate(1)),
+    # LEFT/RIGHT - switch display mode by 1 mode
+    f451SenseHat.KWD_BTN_LFT: btn_handler(lambda sense: sense.set_display_mode(-1)),
+    f451SenseHat.KWD_BTN_RHT: btn_handler(lambda sense: sense.set_display_mode(1)),
+    # MIDDLE - turn display on/off
+    f451SenseHat.KWD_BTN_MDL: btn_middle,
+})
 
 
-def btn_right(event):
-    """SenseHat Joystick RIGHT event
+# Map display modes to data sets shown on Sense HAT LED
+APP_LED_DATA = MappingProxyType({
+    const.DISPL_TEMPS: lambda data: data.temperature,
+    const.DISPL_PRESS: lambda data: data.pressure,
+    const.DISPL_HUMID: lambda data: data.humidity,
+})
 
-    Switch display mode by 1 mode and reset screen blanking
-    """
-    global appRT
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        appRT.sensors['SenseHat'].set_display_mode(1)
-        appRT.displayUpdate = time.time()
+def _min_max(data):
+    """Create min/max based on all collected data
 
+    This will smooth out some hard edges that may occur
+    when the data slice is to short. We skip 'None' values
+    and find both min and max in a single pass.
+    """
+    lo = hi = None
+    for i in data:
+        if i is None:
+            continue
+        if lo is None:
+            lo = hi = i
+        elif i < lo:
+            lo = i
+        elif i > hi:
+            hi = i
 
-def btn_middle(event):
-    """SenseHat Joystick MIDDLE (down) event
+    return (0, 0) if lo is None else (lo, hi)
 
-    Turn display on/off
-    """
-    global appRT
 
-    if event.action != f451SenseHat.BTN_RELEASE:
-        # Wake up?
-        if appRT.sensors['SenseHat'].displSleepMode:
-            appRT.sensors['SenseHat'].update_sleep_mode(False)
-            appRT.displayUpdate = time.time()
-        else:
-            appRT.sensors['SenseHat'].update_sleep_mode(True)
+def _get_color_map(data, colors=None):
+    """Get color map for LED graph if data has valid limits
 
+    NOTE: A limit value of 0 (zero) is valid (e.g. 0 degrees), so
+          we only treat missing (i.e. 'None') limits as invalid.
+    """
+    if all(i is not None for i in data.limits):
+        return f451Common.get_tri_colors(colors, True)
 
-APP_JOYSTICK_ACTIONS = {
-    f451SenseHat.KWD_BTN_UP: btn_up,
-    f451SenseHat.KWD_BTN_DWN: btn_down,
-    f451SenseHat.KWD_BTN_LFT: btn_left,
-    f451SenseHat.KWD_BTN_RHT: btn_right,
-    f451SenseHat.KWD_BTN_MDL: btn_middle,
-}
+    return None
 
 
 def update_SenseHat_LED(sense, data, colors=None):
@@ -445,50 +586,32 @@ def update_SenseHat_LED(sense, data, colors=None):
         colors: (optional) custom color map
     """
 
-    def _minMax(data):
-        """Create min/max based on all collecxted data
+    # Nothing to do if LED is asleep (or disabled via '--noLED')
+    if sense.displSleepMode:
+        return
 
-        This will smooth out some hard edges that may occur
-        when the data slice is to short.
-        """
-        scrubbed = [i for i in data if i is not None]
-        return (min(scrubbed), max(scrubbed)) if scrubbed else (0, 0)
-
-    def _get_color_map(data, colors=None):
-        return f451Common.get_tri_colors(colors, True) if all(data.limits) else None
-
-    # Check display mode. Each mode corresponds to a data type.
-    # Show temperature?
-    if sense.displMode == const.DISPL_TEMPS:
-        minMax = _minMax(data.temperature.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.temperature.as_tuple())
-        colorMap = _get_color_map(dataClean, colors)
-        sense.display_as_graph(dataClean, minMax, colorMap)
-
-    # Show pressure?
-    elif sense.displMode == const.DISPL_PRESS:
-        minMax = _minMax(data.pressure.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.pressure.as_tuple())
-        colorMap = _get_color_map(dataClean, colors)
-        sense.display_as_graph(dataClean, minMax, colorMap)
-
-    # Show humidity?
-    elif sense.displMode == const.DISPL_HUMID:
-        minMax = _minMax(data.humidity.as_tuple().data)
-        dataClean = f451SenseHat.prep_data(data.humidity.as_tuple())
-        colorMap = _get_color_map(dataClean, colors)
-        sense.display_as_graph(dataClean, minMax, colorMap)
-
-    # Or ... display sparkles :-)
-    else:
+    # Check display mode. Each mode corresponds to a data type, and
+    # any other mode means that we ... display sparkles :-)
+    getData = APP_LED_DATA.get(sense.displMode)
+    if getData is None:
         sense.display_sparkle()
+        return
+
+    dataTuple = getData(data).as_tuple()
+    minMax = _min_max(dataTuple.data)
+    dataClean = f451SenseHat.prep_data(dataTuple)
+    colorMap = _get_color_map(dataClean, colors)
+    sense.display_as_graph(dataClean, minMax, colorMap)
 
 
+@functools.lru_cache(maxsize=None)
 def init_cli_parser(appName, appVersion, setDefaults=True):
     """Initialize CLI (ArgParse) parser.
 
     Initialize the ArgParse parser with CLI 'arguments'
-    and return new parser instance.
+    and return parser instance. The parser is built only
+    once and then shared across calls (e.g. when 'main()'
+    is called several times from tests).
 
     Args:
         appName: 'str' with app name
@@ -541,97 +664,104 @@ def collect_data(app, data, cpuTempsQ, timeCurrent, cliUI=False):
     """Collect data from sensors.
 
     This is core of the application where we collect data from
-    one or more sensors, and then upload the data as needed.
+    one or more sensors, and then start an upload as needed.
 
     Args:
         app: application runtime object with config, counters, etc.
         data: main application data queue
+        cpuTempsQ: queue with recent CPU temps
         timeCurrent: time stamp from when loop started
         cliUI: 'bool' to indicate if we use full (console) UI
-
-    Returns:
-        'bool' if 'True' then we're done with all loops and we can exit app
     """
-    exitApp = False
-
     # --- Get sensor data ---
     #
     app.update_action(cliUI, 'Reading sensors …')
 
-    # Get raw temp from sensor
-    tempRaw = tempComp = app.sensors['SenseHat'].get_temperature()
-
-    # Do we need to compensate for CPU temp?
-    if app.tempCompYN:
-        # Get current CPU temp, add to queue, and calculate new average
-        #
-        # NOTE: This feature relies on the 'vcgencmd' which is found on
-        #       RPIs. If this is not run on a RPI (e.g. during testing),
-        #       then we need to neutralize the 'cpuTemp' compensation.
-        cpuTempsQ.append(app.sensors['SenseHat'].get_CPU_temp(False))
-        cpuTempAvg = sum(cpuTempsQ) / float(app.cpuTempsQMaxLen)
+    sense = app.sensors['SenseHat']
 
-        # Smooth out with some averaging to decrease jitter
-        tempComp = tempRaw - ((cpuTempAvg - tempRaw) / app.tempCompFactor)
+    # Get raw temp from sensor and compensate for CPU temp as needed
+    tempRaw = sense.get_temperature()
+    tempComp = app.compensate_temp(tempRaw, cpuTempsQ)
 
     # Get barometric pressure and humidity data
-    pressRaw = app.sensors['SenseHat'].get_pressure()
-    humidRaw = app.sensors['SenseHat'].get_humidity()
+    pressRaw = sense.get_pressure()
+    humidRaw = sense.get_humidity()
     #
     # -----------------------
     # fmt: on
 
-    # Is it time to upload data?
-    if app.timeSinceUpdate >= app.uploadDelay:
-        try:
-            asyncio.run(
-                upload_sensor_data(
-                    app,
-                    {
-                        const.KWD_DATA_TEMPS: round(tempComp, app.ioRounding),
-                        const.KWD_DATA_PRESS: round(pressRaw, app.ioRounding),
-                        const.KWD_DATA_HUMID: round(humidRaw, app.ioRounding),
-                    },
-                    deviceID=f451Common.get_RPI_ID(f451Common.DEF_ID_PREFIX),
-                )
-            )
+    # Is it time to upload data? We only start a new upload if the
+    # previous one is done. The result is handled in 'finish_upload()'.
+    if app.uploadJob is None and app.timeSinceUpdate >= app.uploadDelay:
+        # Round values once and use them for both upload and log
+        rnd = app.ioRounding
+        payload = {
+            const.KWD_DATA_TEMPS: round(tempComp, rnd),
+            const.KWD_DATA_PRESS: round(pressRaw, rnd),
+            const.KWD_DATA_HUMID: round(humidRaw, rnd),
+        }
+        job = asyncio.run_coroutine_threadsafe(
+            upload_sensor_data(app, payload, deviceID=app.deviceID), app.eventLoop
+        )
+        job.add_done_callback(lambda _: app.wakeEvent.set())
+        app.uploadJob = (job, timeCurrent, payload)
+        app.timeUpdate = timeCurrent
 
-        except RequestError as e:
-            app.logger.log_error(f'Application terminated: {e}')
-            sys.exit(1)
+    # Update data set and display to terminal as needed. The LED is
+    # updated by 'main_loop()' right after this.
+    data.temperature.data.append(tempComp)
+    data.pressure.data.append(pressRaw)
+    data.humidity.data.append(humidRaw)
+    app.numReads += 1
 
-        except ThrottlingError as e:
-            # Keep increasing 'ioDelay' each time we get a 'ThrottlingError'
-            app.uploadDelay += app.ioThrottle
-            app.logger.log_error(f'Throttling error: {e}')
+    if cliUI:
+        # Data only changes here, so this is the only place where we need 
+        # to update the terminal UI. Rich 'Live' takes care of refreshing.
+        app.update_data(cliUI, f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR))
 
-        except KeyboardInterrupt:
-            exitApp = True
+    app.update_action(cliUI, None)
 
-        else:
-            # Reset 'uploadDelay' back to normal 'ioFreq' on successful upload
-            app.numUploads += 1
-            app.uploadDelay = app.ioFreq
-            exitApp = exitApp or app.ioUploadAndExit
-            app.logger.log_info(
-                f'Uploaded: TEMP: {round(tempComp, app.ioRounding)} - PRESS: {round(pressRaw, app.ioRounding)} - HUMID: {round(humidRaw, app.ioRounding)}'
-            )
-            app.update_upload_status(cliUI, timeCurrent, f451CLIUI.HTTP_STATUS_OK)
 
-        finally:
-            app.timeUpdate = timeCurrent
-            exitApp = (app.maxUploads > 0) and (app.numUploads >= app.maxUploads)
-            app.update_action(cliUI, None)
+def finish_upload(app, cliUI=False):
+    """Handle result of upload that was started in 'collect_data()'.
 
-    # Update data set and display to terminal as needed
-    data.temperature.data.append(tempComp)
-    data.pressure.data.append(pressRaw)
-    data.humidity.data.append(humidRaw)
+    Uploads run in the background so that we can keep reading sensors
+    and updating the LED while we wait for cloud services to respond.
 
-    update_SenseHat_LED(app.sensors['SenseHat'], data)
-    app.update_data(cliUI, f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR))
+    Args:
+        app: application runtime object with config, counters, etc.
+        cliUI: 'bool' to indicate if we use full (console) UI
+
+    Returns:
+        'bool' if 'True' then we're done with all loops and we can exit app
+    """
+    job, timeStart, payload = app.uploadJob
+    app.uploadJob = None
+    exitApp = False
 
-    return exitApp
+    try:
+        job.result()
+
+    except RequestError as e:
+        app.logger.log_error(f'Application terminated: {e}')
+        sys.exit(1)
+
+    except ThrottlingError as e:
+        # Keep increasing 'ioDelay' each time we get a 'ThrottlingError'
+        app.uploadDelay += app.ioThrottle
+        app.logger.log_error(f'Throttling error: {e}')
+
+    else:
+        # Reset 'uploadDelay' back to normal 'ioFreq' on successful upload
+        app.numUploads += 1
+        app.uploadDelay = app.ioFreq
+        exitApp = app.ioUploadAndExit
+        app.logger.log_info(
+            f'Uploaded: TEMP: {payload[const.KWD_DATA_TEMPS]} - PRESS: {payload[const.KWD_DATA_PRESS]} - HUMID: {payload[const.KWD_DATA_HUMID]}'
+        )
+        app.update_upload_status(cliUI, timeStart, f451CLIUI.HTTP_STATUS_OK)
+
+    return exitApp or ((app.maxUploads > 0) and (app.numUploads >= app.maxUploads))
 
 
 def main_loop(app, data, cliUI=False):
@@ -650,52 +780,100 @@ def main_loop(app, data, cliUI=False):
     # CPU temp queue so that we have data to calculate averages.
     cpuTempsQ = appRT.init_CPU_temps()
 
-    # Set 'wait' counter 'exit' flag and start the loop!
+    # Look up SenseHat object only once
+    sense = app.sensors['SenseHat']
+
+    # Set 'exit' flag and time for first sensor read, and start the loop!
     exitApp = False
-    waitForSensor = 0
+    sensorReadNext = 0
+    ledDrawn = None     # What's currently shown on LED (see below)
+    progDrawn = None    # Num pixels currently shown in LED progress bar
 
     while not exitApp:
         try:
-            # fmt: off
-            timeCurrent = time.time()
+            timeCurrent = time.monotonic()
             app.timeSinceUpdate = timeCurrent - app.timeUpdate
-            app.sensors['SenseHat'].update_sleep_mode(
-                (timeCurrent - app.displayUpdate) > app.sensors['SenseHat'].displSleepTime, # Time to sleep?
-                # cliArgs.noLED,                                                            # Force no LED?
-                app.sensors['SenseHat'].displSleepMode                                      # Already asleep?
-            )
-            # fmt: on
 
-            # Update Sense HAT prog bar as needed
-            app.sensors['SenseHat'].display_progress(app.timeSinceUpdate / app.uploadDelay)
+            # Is it time to put display to sleep? Only the joystick can wake 
+            # it up again, so there's nothing to do if it's already asleep.
+            if (
+                not sense.displSleepMode
+                and (timeCurrent - app.displayUpdate) > sense.displSleepTime
+            ):
+                sense.update_sleep_mode(True)
 
             # Do we need to wait for next sensor read?
+            waitForSensor = sensorReadNext - timeCurrent
             if waitForSensor > 0:
                 app.update_progress(cliUI, int((1 - waitForSensor / app.ioWait) * 100))
 
-            # ... or can we collect more 'specimen'? :-P
-            else:
+            # ... or can we collect more 'specimen'? :-P We skip sensor reads
+            # when nobody can see the data (i.e. LED is asleep and there is no
+            # terminal UI) unless we need fresh data for the next upload.
+            #
+            # NOTE: CPU temps are only sampled as part of a sensor read. So while
+            #       we skip reads, the CPU temp average (for temp compensation)
+            #       covers the last few pre-upload reads instead of the last few
+            #       seconds.
+            elif (
+                cliUI
+                or not sense.displSleepMode
+                or (app.uploadDelay - app.timeSinceUpdate) < APP_MIN_SENSOR_READ_WAIT * 2
+            ):
                 app.update_action(cliUI, None)
-                exitApp = collect_data(app, data, cpuTempsQ, timeCurrent, cliUI)
-                waitForSensor = max(app.ioWait, APP_MIN_PROG_WAIT)
+                collect_data(app, data, cpuTempsQ, timeCurrent, cliUI)
+                sensorReadNext = timeCurrent + max(app.ioWait, APP_MIN_PROG_WAIT)
                 if app.ioWait > APP_MIN_PROG_WAIT:
                     app.update_progress(cliUI, None, 'Waiting for sensor')
 
-            # Update UI and SenseHAT LED as needed even when we're just waiting for 
-            # next upload. This means that more sparkles are generated as well
-            app.update_data(
-                cliUI, f451CLIUI.prep_data(data.as_dict(), APP_DATA_TYPES, APP_DELTA_FACTOR)
+            # Is background upload done?
+            if app.uploadJob is not None and app.uploadJob[0].done():
+                exitApp = finish_upload(app, cliUI)
+
+            # Update SenseHAT LED as needed even when we're just waiting for 
+            # next upload. This means that more sparkles are generated as well.
+            # Graphs and sparkles repaint the whole LED, incl. the progress bar.
+            # But graphs only need to be redrawn when we have new data, or when
+            # display mode or joystick state changed. We also redraw when the 
+            # progress bar shrinks (e.g. after upload) as that is the only way
+            # to clear pixels from the bar.
+            progress = (timeCurrent - app.timeUpdate) / app.uploadDelay
+            progPixels = int(progress * APP_PROG_PIXELS)
+            ledNow = (sense.displMode, app.displayUpdate, app.numReads)
+            ledRedraw = (
+                ledNow != ledDrawn
+                or sense.displMode not in APP_LED_DATA
+                or (progDrawn is not None and progPixels < progDrawn)
             )
-            update_SenseHat_LED(app.sensors['SenseHat'], data)
-            app.sensors['SenseHat'].display_progress(app.timeSinceUpdate / app.uploadDelay)
+            if ledRedraw:
+                update_SenseHat_LED(sense, data)
+                ledDrawn = ledNow
+
+            # Progress bar goes on top of LED graph, so we must draw it again 
+            # whenever the LED was redrawn. Otherwise we only need to draw it
+            # when the number of pixels in the bar has changed.
+            if not sense.displSleepMode and (ledRedraw or progPixels != progDrawn):
+                sense.display_progress(progress)
+                progDrawn = progPixels
 
         except KeyboardInterrupt:
             exitApp = True
 
-        # Are we done?
+        # Are we done? If not, then wait for next loop cycle, or until 
+        # a joystick event wakes us up so that we can update the LED.
         if not exitApp:
-            time.sleep(app.loopWait)
-            waitForSensor -= app.loopWait
+            loopWait = app.loopWait
+
+            # If nobody can see the data, then we can wait until it's
+            # time to read sensors again for the next upload.
+            if not cliUI and sense.displSleepMode:
+                loopWait = max(
+                    loopWait,
+                    app.uploadDelay - app.timeSinceUpdate - APP_MIN_SENSOR_READ_WAIT * 2
+                )
+
+            if app.wakeEvent.wait(loopWait):
+                app.wakeEvent.clear()
 
 
 # =========================================================
@@ -719,7 +897,7 @@ def main(cliArgs=None):  # sourcery skip: extract-method
         cliArgs:
             CLI arguments used to start application
     """
-    global appRT
+    global appRT, f451Cloud, RequestError, ThrottlingError
 
     # Parse CLI args and show 'help' and exit if no args
     cli = init_cli_parser(APP_NAME, APP_VERSION, True)
@@ -732,10 +910,21 @@ def main(cliArgs=None):  # sourcery skip: extract-method
         print(f'{APP_NAME} (v{APP_VERSION})')
         sys.exit(0)
 
+    # Load cloud support once here (see note at top of this file)
+    import f451_common.cloud as f451Cloud
+    from Adafruit_IO import RequestError, ThrottlingError
+
     # Get core settings and initialize core data queue
     appData = f451SenseData.SenseData(None, APP_MAX_DATA)
     appRT.init_runtime(cliArgs, appData)
 
+    # Install Rich 'traceback' handler only when we're in 'debug' mode
+    # as it's fairly expensive to import and set up.
+    if appRT.debugMode:
+        from rich.traceback import install as install_rich_traceback
+
+        install_rich_traceback(show_locals=True)
+
     # Verify that feeds exist and initialize them
     try:
         appRT.add_feed(
@@ -762,20 +951,20 @@ def main(cliArgs=None):  # sourcery skip: extract-method
         # Initialize device instance which includes all sensors
         # and LED display on Sense HAT. Also initialize joystick
         # events and set 'sleep' and 'display' modes.
-        appRT.add_sensor('SenseHat', f451SenseHat.SenseHat)
-        appRT.sensors['SenseHat'].joystick_init(**APP_JOYSTICK_ACTIONS)
-        appRT.sensors['SenseHat'].add_displ_modes(APP_DISPL_MODES)
-        appRT.sensors['SenseHat'].update_sleep_mode(cliArgs.noLED)
-        appRT.sensors['SenseHat'].displProgress = cliArgs.progress
-        appRT.sensors['SenseHat'].display_message(APP_NAME, COLOR_LOGO_FG, COLOR_LOGO_BG)
-
-        appRT.sensors['SenseHat'].set_display_mode(
+        sense = appRT.add_sensor('SenseHat', f451SenseHat.SenseHat)
+        sense.joystick_init(**APP_JOYSTICK_ACTIONS)
+        sense.add_displ_modes(APP_DISPL_MODES)
+        sense.update_sleep_mode(cliArgs.noLED)
+        sense.displProgress = cliArgs.progress
+        sense.display_message(APP_NAME, COLOR_LOGO_FG, COLOR_LOGO_BG)
+
+        sense.set_display_mode(
             cliArgs.dmode or appRT.config.get(f451SenseHat.KWD_DISPLAY)
         )
 
     except KeyboardInterrupt:
-        appRT.sensors['SenseHat'].display_reset()
-        appRT.sensors['SenseHat'].display_off()
+        sense.display_reset()
+        sense.display_off()
         print(f'{APP_NAME} (v{APP_VERSION}) - Session terminated by user')
         sys.exit(0)
 
@@ -787,7 +976,9 @@ def main(cliArgs=None):  # sourcery skip: extract-method
         if cliArgs.noCLI:
             main_loop(appRT, appData)
         else:
-            appRT.console.update_upload_next(appRT.timeUpdate + appRT.uploadDelay)  # type: ignore
+            from rich.live import Live
+
+            appRT.console.update_upload_next(wall_time(appRT.timeUpdate + appRT.uploadDelay))  # type: ignore
             with Live(appRT.console.layout, screen=True, redirect_stderr=False):  # noqa: F841 # type: ignore
                 main_loop(appRT, appData, True)
 
@@ -796,8 +987,9 @@ def main(cliArgs=None):  # sourcery skip: extract-method
     # -----------------------------
 
     # A bit of clean-up before we exit
-    appRT.sensors['SenseHat'].display_reset()
-    appRT.sensors['SenseHat'].display_off()
+    sense.display_reset()
+    sense.display_off()
+    appRT.close_event_loop()
 
     # Show session summary
     appRT.show_summary(cliArgs, appData)